@@ -1,5 +1,12 @@
 """Semantic search MCP server for Obsidian vaults."""
 
-from .indexer import VaultIndexer, VaultWatcher
-
 __all__ = ["VaultIndexer", "VaultWatcher"]
+
+
+def __getattr__(name):
+    # Imported on first use so CLI commands answered by a running server
+    # do not pay for loading torch and FAISS.
+    if name in __all__:
+        from . import indexer
+        return getattr(indexer, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
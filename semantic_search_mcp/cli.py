@@ -4,7 +4,7 @@ import argparse
 import os
 import sys
 
-from .indexer import VaultIndexer
+from . import ipc
 
 
 def _get_content_path() -> str:
@@ -33,9 +33,18 @@ def search():
         print(f"Query: {query}", file=sys.stderr)
         print(file=sys.stderr)
 
-    indexer = VaultIndexer(content_path)
+    # Prefer a running server, which already has the model and index loaded
+    results = ipc.request(content_path, {"cmd": "search", "query": query, "top_k": args.top_k})
+    if results is None:
+        from .indexer import VaultIndexer
+        indexer = VaultIndexer(content_path)
+        results = indexer.search(query, top_k=args.top_k)
+    elif args.verbose:
+        print("Answered by running server", file=sys.stderr)
 
-    results = indexer.search(query, top_k=args.top_k)
+    if isinstance(results, dict) and "error" in results:
+        print(f"Error: {results['error']}", file=sys.stderr)
+        sys.exit(1)
 
     if not results:
         print("No results found.")
@@ -61,9 +70,15 @@ def duplicates():
         print(f"File: {args.file}", file=sys.stderr)
         print(file=sys.stderr)
 
-    indexer = VaultIndexer(content_path, duplicate_threshold=args.threshold)
-
-    results = indexer.find_duplicates(args.file)
+    # Prefer a running server, which already has the model and index loaded
+    results = ipc.request(content_path, {"cmd": "duplicates", "file": args.file,
+                                         "threshold": args.threshold})
+    if results is None:
+        from .indexer import VaultIndexer
+        indexer = VaultIndexer(content_path, duplicate_threshold=args.threshold)
+        results = indexer.find_duplicates(args.file)
+    elif args.verbose:
+        print("Answered by running server", file=sys.stderr)
 
     if isinstance(results, dict) and "error" in results:
         print(f"Error: {results['error']}", file=sys.stderr)
@@ -1,17 +1,67 @@
 """Core indexer for semantic search over markdown files."""
 
-import json
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+import copy
+import hashlib
+from itertools import islice
+import os
 from pathlib import Path
-from threading import Thread
+import tempfile
+from threading import Lock, RLock, Thread, Timer
 import time
 
 import faiss
 import numpy as np
 from sentence_transformers import SentenceTransformer
+import torch
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
 
+# Bump when the way documents are turned into vectors changes, so indexed
+# embeddings from an older scheme are not mixed with new ones.
+_EMBEDDING_VERSION = 3
+
+
+def _content_hash(text: str) -> str:
+    """Return a short digest identifying file content in the index."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _chunk(text: str, offsets: list[tuple[int, int]], size: int) -> list[str]:
+    """Split text into overlapping windows of at most `size` tokens, given token offsets."""
+    if len(offsets) <= size:
+        return [text]
+    stride = size * 3 // 4
+    return [text[offsets[start][0]:offsets[min(start + size, len(offsets)) - 1][1]]
+            for start in range(0, len(offsets) - size + stride, stride)]
+
+
+def _write_atomic(path: Path, write):
+    """Write a file via a temporary sibling so readers never see a partial file."""
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        write(f)
+    os.replace(tmp, path)
+
+
+def _iter_markdown(root: str):
+    """Yield paths of markdown files below root, skipping .semantic-search."""
+    stack = [root]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name != ".semantic-search":
+                            stack.append(entry.path)
+                    elif entry.name.endswith(".md") and entry.is_file():
+                        yield entry.path
+        except OSError as e:
+            print(f"[WARN] Failed to scan directory: {e}")
+
+
 class VaultIndexer:
     """Indexes markdown files and provides semantic search."""
 
@@ -23,36 +73,156 @@ class VaultIndexer:
 
         # Store index in vault's .semantic-search directory
         self.index_dir = self.vault_path / ".semantic-search"
-        self.index_file = self.index_dir / "vector_index.faiss"
-        self.meta_file = self.index_dir / "index_meta.json"
-
-        self.model = SentenceTransformer(embedding_model)
-        self.meta = {}  # {idx: {"path": ..., "content": ...}}
+        self.index_path = self.index_dir / "vector_index.faiss"
+        self.paths_file = self.index_dir / "index_paths.txt"
+        self.hashes_file = self.index_dir / "index_hashes.npz"
+
+        self.model = self._load_model(embedding_model)
+        # encode() reconfigures the shared tokenizer's padding and truncation on
+        # every call, so offsets for chunking come from a private copy instead.
+        # Slow tokenizers cannot return offsets; their documents stay one chunk.
+        tokenizer = self.model.tokenizer
+        self._chunk_tokenizer = copy.deepcopy(tokenizer) if tokenizer.is_fast else None
+        self._chunk_lock = Lock()
+        self.paths = []  # FAISS id i -> paths[i]
+        # FAISS id i -> content hash of paths[i]; vectors of unchanged content
+        # are read back from the index instead of being re-encoded
+        self.hashes = []
         self.index = None
+        # Interactive use repeats queries; LRU of query -> embedding
+        self._query_cache = OrderedDict()
+        self._query_cache_size = 256
+        self._query_lock = Lock()
+        # Guards index/paths/hashes; rebuilds swap in fresh ones under this lock
+        self._index_lock = RLock()
+        # Serializes writers so snapshots reach disk in the order they were taken
+        self._save_lock = Lock()
+        # Incremental updates only mark the index dirty; see save_if_dirty()
+        self._dirty = False
+        self._last_save = time.monotonic()
         self._load_index()
 
+    def _load_model(self, embedding_model: str) -> SentenceTransformer:
+        """Load the embedding model with the fastest backend available."""
+        if torch.cuda.is_available():
+            # FP16 halves memory traffic on GPU; embeddings are cast back to
+            # float32 before they reach FAISS.
+            self.backend, self.dtype = "torch", "float16"
+            return SentenceTransformer(embedding_model).half()
+        self.dtype = "float32"
+        # Models without an ONNX file on the hub are exported on load; the
+        # export is kept in the user cache (not the vault) so later starts
+        # load it directly.
+        cache_home = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+        onnx_dir = cache_home / "semantic-search-mcp" / "onnx" / embedding_model.replace("/", "--")
+        try:
+            # modules.json is written last, so its presence marks a complete save
+            if (onnx_dir / "modules.json").exists():
+                model = SentenceTransformer(str(onnx_dir), backend="onnx")
+            else:
+                model = SentenceTransformer(embedding_model, backend="onnx")
+                # An export lives in a temporary directory; a model that ships
+                # ONNX weights is loaded from the Hugging Face cache instead.
+                try:
+                    save_dir = Path(model[0].auto_model.model_save_dir).resolve()
+                    if save_dir.is_relative_to(Path(tempfile.gettempdir()).resolve()):
+                        model.save_pretrained(str(onnx_dir), create_model_card=False)
+                except Exception as e:
+                    print(f"[WARN] Could not cache ONNX model: {e}")
+        except Exception as e:
+            print(f"[INFO] ONNX Runtime backend not available, using PyTorch: {e}")
+            self.backend = "torch"
+            return SentenceTransformer(embedding_model)
+        print("[INFO] Using ONNX Runtime backend.")
+        self.backend = "onnx"
+        return model
+
     def _load_index(self):
         """Load existing index or build new one."""
         self.index_dir.mkdir(parents=True, exist_ok=True)
 
-        if self.index_file.exists() and self.meta_file.exists():
-            self.index = faiss.read_index(str(self.index_file))
-            with open(self.meta_file, "r") as f:
-                self.meta = json.load(f)
-            print(f"[INFO] Loaded index with {len(self.meta)} entries.")
+        if self.hashes_file.exists():
+            self._load_hashes()
+
+        if self.index_path.exists() and self.paths_file.exists():
+            try:
+                self.index = faiss.read_index(str(self.index_path))
+            except RuntimeError as e:
+                print(f"[WARN] Could not read index: {e}")
+                self.index = None
+            text = self.paths_file.read_text(encoding="utf-8")
+            self.paths = text.split("\n") if text else []
+            if (isinstance(self.index, faiss.IndexHNSWSQ)
+                    and self.index.ntotal == len(self.paths) == len(self.hashes)):
+                print(f"[INFO] Loaded index with {len(self.paths)} entries.")
+                return
+            print("[INFO] Index uses an outdated format. Rebuilding...")
         else:
-            self.index = faiss.IndexFlatIP(self.model.get_sentence_embedding_dimension())
-            self.meta = {}
             print("[INFO] No existing index found. Building initial index...")
-            self.rebuild_index()
+        self.rebuild_index()
+
+    def _load_hashes(self):
+        """Load content hashes so unchanged files skip the model on rebuild."""
+        with np.load(self.hashes_file) as data:
+            if (int(data["version"]) != _EMBEDDING_VERSION
+                    or str(data["model"]) != self.embedding_model
+                    # Backends and precisions give slightly different vectors
+                    or str(data["backend"]) != self.backend
+                    or str(data["dtype"]) != self.dtype):
+                return
+            self.hashes = data["hashes"].tolist()
+
+    def _indexed_rows(self) -> dict[str, int]:
+        """Map content hash -> FAISS id of a vector for it; call under the index lock."""
+        if (self.index is None or self.index.ntotal != len(self.hashes)
+                or self.index.d != self.model.get_sentence_embedding_dimension()):
+            return {}
+        return {digest: row for row, digest in enumerate(self.hashes)}
+
+    def _new_index(self) -> faiss.Index:
+        """Create an empty HNSW index; inner product on normalized vectors is cosine."""
+        index = faiss.IndexHNSWSQ(self.model.get_sentence_embedding_dimension(),
+                                  faiss.ScalarQuantizer.QT_fp16, 32, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = 200
+        index.hnsw.efSearch = 128
+        return index
 
     def save_index(self):
         """Persist index to disk."""
-        faiss.write_index(self.index, str(self.index_file))
-        with open(self.meta_file, "w") as f:
-            json.dump(self.meta, f)
+        with self._save_lock:
+            # Only take a snapshot under the index lock; searches keep running
+            # while it is written out.
+            with self._index_lock:
+                index_bytes = faiss.serialize_index(self.index)
+                paths = list(self.paths)
+                hashes = list(self.hashes)
+                self._dirty = False
+                self._last_save = time.monotonic()
+            try:
+                _write_atomic(self.hashes_file, lambda f: np.savez(
+                    f, version=np.array(_EMBEDDING_VERSION), model=np.array(self.embedding_model),
+                    backend=np.array(self.backend), dtype=np.array(self.dtype),
+                    hashes=np.array(hashes, dtype=str)))
+                _write_atomic(self.index_path, index_bytes.tofile)
+                _write_atomic(self.paths_file, lambda f: f.write("\n".join(paths).encode("utf-8")))
+            except Exception:
+                with self._index_lock:
+                    self._dirty = True
+                raise
         print("[INFO] Index saved.")
 
+    def save_if_dirty(self, interval: float = 30.0):
+        """Persist index if it has unsaved changes and `interval` seconds have passed."""
+        with self._index_lock:
+            due = self._dirty and time.monotonic() - self._last_save >= interval
+        # save_index() writes outside the index lock, so searches are not blocked
+        if due:
+            self.save_index()
+
+    def _is_note(self, file_path: Path) -> bool:
+        """Whether file_path is a markdown note and not a file under index_dir."""
+        return file_path.suffix == ".md" and self.index_dir not in file_path.parents
+
     def _read_file(self, file_path: Path) -> str | None:
         """Read file with encoding fallback."""
         encodings = ["utf-8", "latin-1", "cp1252"]
@@ -65,69 +235,214 @@ class VaultIndexer:
         print(f"[WARN] Could not decode {file_path} with any encoding")
         return None
 
-    def _embed_text(self, text: str) -> np.ndarray:
-        """Generate embedding vector for text."""
-        vec = self.model.encode([text], normalize_embeddings=True)
-        return vec.astype("float32")
+    def _embed_queries(self, queries: list[str]) -> np.ndarray:
+        """Generate (N, D) query vectors, encoding only queries not in the cache."""
+        with self._query_lock:
+            found = {}
+            for query in queries:
+                if query in self._query_cache:
+                    self._query_cache.move_to_end(query)
+                    found[query] = self._query_cache[query]
+        misses = [query for query in dict.fromkeys(queries) if query not in found]
+        if misses:
+            vecs = self.model.encode(misses, normalize_embeddings=True, convert_to_numpy=True)
+            # Only the FP16 CUDA model needs a cast; float32 output is not copied
+            vecs = np.asarray(vecs, dtype=np.float32)
+            found.update(zip(misses, vecs))
+            with self._query_lock:
+                self._query_cache.update(zip(misses, vecs))
+                while len(self._query_cache) > self._query_cache_size:
+                    self._query_cache.popitem(last=False)
+        return np.stack([found[query] for query in queries])
+
+    def _embed_texts(self, texts: list[str]) -> np.ndarray:
+        """Embed documents by mean-pooling the embeddings of their chunks."""
+        # Windows are cut at token offsets so none exceeds the model's limit
+        size = self.model.max_seq_length - 2  # room for [CLS] and [SEP]
+        if self._chunk_tokenizer is None:
+            offsets = [[] for _ in texts]
+        else:
+            with self._chunk_lock:
+                offsets = self._chunk_tokenizer(texts, add_special_tokens=False, verbose=False,
+                                                return_offsets_mapping=True)["offset_mapping"]
+        chunks = []
+        starts = []
+        for text, text_offsets in zip(texts, offsets):
+            starts.append(len(chunks))
+            chunks.extend(_chunk(text, text_offsets, size))
+        # encode() sorts its input by length before batching and restores
+        # the original order afterwards, so rows stay aligned with the input.
+        embs = self.model.encode(chunks, batch_size=128, normalize_embeddings=False,
+                                 convert_to_numpy=True)
+        # Chunks of a document are contiguous, so one reduceat sums them per document
+        doc_vecs = np.add.reduceat(np.asarray(embs, dtype=np.float32), starts, axis=0)
+        # Normalize once, in place, on the pooled block
+        faiss.normalize_L2(doc_vecs)
+        return doc_vecs
+
+    def _embed_contents(self, contents: list[str], hashes: list[str]) -> np.ndarray:
+        """Embed file contents, encoding only those whose hash is not in the index."""
+        embs = np.empty((len(contents), self.model.get_sentence_embedding_dimension()),
+                        dtype=np.float32)
+        missing = {}  # hash -> (content, rows of embs waiting for it)
+        with self._index_lock:
+            indexed = self._indexed_rows()
+            for i, (content, digest) in enumerate(zip(contents, hashes)):
+                if digest in indexed:
+                    embs[i] = self.index.reconstruct(indexed[digest])
+                else:
+                    missing.setdefault(digest, (content, []))[1].append(i)
+        if missing:
+            new_embs = self._embed_texts([content for content, _ in missing.values()])
+            for (_, rows), vec in zip(missing.values(), new_embs):
+                embs[rows] = vec
+        return embs
 
     def index_file(self, file_path):
         """Add or update a single file in the index."""
-        file_path = Path(file_path)
-        if not file_path.exists() or file_path.suffix != ".md":
-            return
-        content = self._read_file(file_path)
-        if content is None:
+        self.index_files([file_path])
+
+    def index_files(self, file_paths):
+        """Add or update several files in the index with a single encode call."""
+        with self._index_lock:
+            indexed = dict(zip(self.paths, self.hashes))
+        paths = []
+        hashes = []
+        contents = []
+        for file_path in map(Path, file_paths):
+            if not self._is_note(file_path) or not file_path.exists():
+                continue
+            content = self._read_file(file_path)
+            if content is None:
+                continue
+            digest = _content_hash(content)
+            # Editors often touch files without changing them
+            if indexed.get(str(file_path)) == digest:
+                continue
+            paths.append(str(file_path))
+            hashes.append(digest)
+            contents.append(content)
+        if not contents:
             return
-        vec = self._embed_text(content)
-        idx = len(self.meta)
-        self.index.add(vec)
-        self.meta[str(idx)] = {"path": str(file_path), "content": content}
-        print(f"[INFO] Indexed {file_path}")
+
+        embs = self._embed_contents(contents, hashes)
+        with self._index_lock:
+            self.index.add(embs)
+            self.paths.extend(paths)
+            self.hashes.extend(hashes)
+            self._dirty = True
+        for path in paths:
+            print(f"[INFO] Indexed {path}")
 
     def rebuild_index(self):
         """Rebuild entire index from vault."""
-        self.index = faiss.IndexFlatIP(self.model.get_sentence_embedding_dimension())
-        new_meta = {}
-        idx = 0
-        for file_path in self.vault_path.rglob("*.md"):
-            # Skip files in .semantic-search directory
-            if ".semantic-search" in str(file_path):
-                continue
+        file_paths = list(_iter_markdown(str(self.vault_path)))
+
+        def read(file_path: str) -> str | None:
             try:
-                content = self._read_file(file_path)
+                return self._read_file(file_path)
+            except Exception as e:
+                print(f"[WARN] Failed to read {file_path}: {e}")
+                return None
+
+        with self._index_lock:
+            old_index = self.index
+            old_rows = self._indexed_rows()
+        paths = []
+        hashes = []
+        rows = {}  # hash -> row of embs that holds, or will hold, its vector
+        missing = {}  # hash -> content waiting to be encoded
+        pending = []  # (row, hash) of rows waiting for missing to be encoded
+        # Allocated once for every file found; rows of unreadable files stay unused
+        embs = np.empty((len(file_paths), self.model.get_sentence_embedding_dimension()),
+                        dtype=np.float32)
+
+        def flush_missing():
+            new_embs = dict(zip(missing, self._embed_texts(list(missing.values()))))
+            for row, digest in pending:
+                embs[row] = new_embs[digest]
+            print(f"[INFO] Embedded {len(missing)} new or changed files...")
+            missing.clear()
+            pending.clear()
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            # Keep at most 256 reads in flight: the pool reads ahead while the
+            # model encodes, without holding the whole vault's text in memory.
+            to_read = iter(file_paths)
+            reads = deque((file_path, pool.submit(read, file_path))
+                          for file_path in islice(to_read, 256))
+            while reads:
+                file_path, future = reads.popleft()
+                next_path = next(to_read, None)
+                if next_path is not None:
+                    reads.append((next_path, pool.submit(read, next_path)))
+                content = future.result()
                 if content is None:
                     continue
-                vec = self._embed_text(content)
-                self.index.add(vec)
-                new_meta[str(idx)] = {"path": str(file_path), "content": content}
-                idx += 1
-                if idx % 100 == 0:
-                    print(f"[INFO] Indexed {idx} files...")
-            except Exception as e:
-                print(f"[WARN] Failed to index {file_path}: {e}")
-        self.meta = new_meta
+                digest = _content_hash(content)
+                row = len(paths)
+                paths.append(file_path)
+                hashes.append(digest)
+                if digest in rows and digest not in missing:
+                    embs[row] = embs[rows[digest]]
+                    continue
+                rows.setdefault(digest, row)
+                if digest in old_rows:
+                    # Unchanged content: read the vector back from the live index
+                    with self._index_lock:
+                        embs[row] = old_index.reconstruct(old_rows[digest])
+                    continue
+                pending.append((row, digest))
+                missing.setdefault(digest, content)
+                if len(missing) == 64:
+                    flush_missing()
+        if missing:
+            flush_missing()
+
+        new_index = self._new_index()
+        if paths:
+            new_index.add(embs[:len(paths)])
+        with self._index_lock:
+            self.index, self.paths, self.hashes = new_index, paths, hashes
         self.save_index()
-        print(f"[INFO] Rebuilt index with {len(self.meta)} files.")
+        print(f"[INFO] Rebuilt index with {len(self.paths)} files.")
 
     def search(self, query: str, top_k: int = 5) -> list[dict]:
         """Search for related notes."""
-        if len(self.meta) == 0:
+        if len(self.paths) == 0:
             return []
 
-        vec = self._embed_text(query)
-        k = min(top_k, len(self.meta))
-        D, I = self.index.search(vec, k)
+        vec = self._embed_queries([query])
+        with self._index_lock:
+            paths = self.paths
+            D, I = self.index.search(vec, min(top_k, len(paths)))
         results = []
         for score, idx in zip(D[0], I[0]):
-            if str(idx) in self.meta:
+            if idx >= 0:
                 results.append({
-                    "path": self.meta[str(idx)]["path"],
+                    "path": paths[idx],
                     "score": float(score)
                 })
         return results
 
-    def find_duplicates(self, file_path: str) -> list[dict]:
+    def search_many(self, queries: list[str], top_k: int = 5) -> list[list[dict]]:
+        """Search for several queries with one encode call and one FAISS search."""
+        if len(self.paths) == 0:
+            return [[] for _ in queries]
+
+        vecs = self._embed_queries(queries)
+        with self._index_lock:
+            paths = self.paths
+            D, I = self.index.search(vecs, min(top_k, len(paths)))
+        return [
+            [{"path": paths[idx], "score": float(score)} for score, idx in zip(scores, ids) if idx >= 0]
+            for scores, ids in zip(D, I)
+        ]
+
+    def find_duplicates(self, file_path: str, threshold: float | None = None) -> list[dict]:
         """Find potential duplicates of a file."""
+        if threshold is None:
+            threshold = self.duplicate_threshold
         file_path = Path(file_path)
         if not file_path.is_absolute():
             file_path = self.vault_path / file_path
@@ -138,21 +453,27 @@ class VaultIndexer:
         content = self._read_file(file_path)
         if content is None:
             return {"error": f"Could not read file: {file_path}"}
-        vec = self._embed_text(content)
+        vec = self._embed_contents([content], [_content_hash(content)])
 
-        if len(self.meta) == 0:
+        if len(self.paths) == 0:
             return []
 
-        D, I = self.index.search(vec, len(self.meta))
+        # HNSW only explores the neighbourhood of the query, so fetch a bounded
+        # candidate set and apply the threshold afterwards.
+        with self._index_lock:
+            paths = self.paths
+            D, I = self.index.search(vec, min(len(paths), 200))
+        scores, ids = D[0], I[0]
+        keep = (ids >= 0) & (scores > threshold)
+        own_path = file_path.resolve()
         duplicates = []
-        for score, idx in zip(D[0], I[0]):
-            if str(idx) in self.meta and score > self.duplicate_threshold:
-                # Skip the file itself
-                if Path(self.meta[str(idx)]["path"]).resolve() != file_path.resolve():
-                    duplicates.append({
-                        "path": self.meta[str(idx)]["path"],
-                        "score": float(score)
-                    })
+        for score, idx in zip(scores[keep], ids[keep]):
+            # Skip the file itself; only the few hits above threshold get resolved
+            if Path(paths[idx]).resolve() != own_path:
+                duplicates.append({
+                    "path": paths[idx],
+                    "score": float(score)
+                })
         return duplicates
 
 
@@ -162,13 +483,14 @@ class VaultWatcher:
     def __init__(self, indexer: VaultIndexer):
         self.indexer = indexer
         self._observer = None
+        self._handler = None
         self._thread = None
 
     def start(self, background: bool = True):
         """Start watching the vault."""
-        handler = _VaultEventHandler(self.indexer)
+        self._handler = _VaultEventHandler(self.indexer)
         self._observer = Observer()
-        self._observer.schedule(handler, str(self.indexer.vault_path), recursive=True)
+        self._observer.schedule(self._handler, str(self.indexer.vault_path), recursive=True)
         self._observer.start()
         print(f"[INFO] Watching vault at {self.indexer.vault_path}")
 
@@ -182,6 +504,11 @@ class VaultWatcher:
         try:
             while True:
                 time.sleep(1)
+                try:
+                    self.indexer.save_if_dirty()
+                except Exception as e:
+                    # The index stays dirty, so the next pass retries
+                    print(f"[WARN] Failed to save index: {e}")
         except KeyboardInterrupt:
             self.stop()
 
@@ -189,23 +516,91 @@ class VaultWatcher:
         if self._observer:
             self._observer.stop()
             self._observer.join()
+        if self._handler:
+            # Index events still waiting out the debounce delay
+            self._handler.flush_now()
+        self.indexer.save_if_dirty(interval=0)
 
 
 class _VaultEventHandler(FileSystemEventHandler):
-    def __init__(self, indexer: VaultIndexer):
+    """Coalesces file events and applies them to the index in batches."""
+
+    def __init__(self, indexer: VaultIndexer, delay: float = 0.5, max_delay: float = 5.0):
         self.indexer = indexer
+        self.delay = delay
+        self.max_delay = max_delay
+        self._pending: set[str] = set()
+        self._needs_rebuild = False
+        self._first_event = None  # monotonic time of the oldest unflushed event
+        self._timer = None
+        self._lock = Lock()
+        self._flush_lock = Lock()
+
+    def _wants(self, event) -> bool:
+        return not event.is_directory and self.indexer._is_note(Path(event.src_path))
 
     def on_modified(self, event):
-        if not event.is_directory:
-            self.indexer.index_file(event.src_path)
-            self.indexer.save_index()
+        if self._wants(event):
+            self._queue(event.src_path)
 
     def on_created(self, event):
-        if not event.is_directory:
-            self.indexer.index_file(event.src_path)
-            self.indexer.save_index()
+        if self._wants(event):
+            self._queue(event.src_path)
 
     def on_deleted(self, event):
-        if not event.is_directory:
-            print(f"[INFO] File removed, rebuilding index...")
-            self.indexer.rebuild_index()
+        if self._wants(event):
+            with self._lock:
+                self._needs_rebuild = True
+                self._reset_timer()
+
+    def _queue(self, path: str):
+        with self._lock:
+            self._pending.add(path)
+            self._reset_timer()
+
+    def _reset_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+        now = time.monotonic()
+        if self._first_event is None:
+            self._first_event = now
+        # A steady stream of events must not postpone indexing forever
+        delay = max(0.0, min(self.delay, self._first_event + self.max_delay - now))
+        self._timer = Timer(delay, self._flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def flush_now(self):
+        """Apply pending events immediately instead of waiting for the timer."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+        self._flush()
+
+    def _flush(self):
+        # Serialize flushes so a batch never lands in an index that a
+        # concurrent rebuild is about to replace.
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, set()
+                needs_rebuild, self._needs_rebuild = self._needs_rebuild, False
+                self._first_event = None
+            try:
+                if needs_rebuild:
+                    # A rebuild re-reads every file, so it covers pending changes too
+                    print("[INFO] File removed, rebuilding index...")
+                    self.indexer.rebuild_index()
+                elif pending:
+                    self.indexer.index_files(pending)
+            except Exception as e:
+                print(f"[WARN] Failed to update index, retrying in {self.max_delay}s: {e}")
+                # Put the batch back so it is not lost
+                with self._lock:
+                    self._pending |= pending
+                    self._needs_rebuild |= needs_rebuild
+                    if self._first_event is None:
+                        # No newer event has scheduled a flush; schedule the retry
+                        self._first_event = time.monotonic()
+                        self._timer = Timer(self.max_delay, self._flush)
+                        self._timer.daemon = True
+                        self._timer.start()
@@ -0,0 +1,121 @@
+"""Local socket that lets CLI commands reuse a running server's indexer."""
+
+import json
+import os
+import socket
+import socketserver
+import tempfile
+from pathlib import Path
+from threading import Thread
+
+_UnixServer = getattr(socketserver, "ThreadingUnixStreamServer", None)
+
+
+def socket_path(content_path: str) -> Path:
+    """Get the socket path for a content directory."""
+    return Path(content_path) / ".semantic-search" / "server.sock"
+
+
+def request(content_path: str, payload: dict, timeout: float | None = None):
+    """Send a request to the server for content_path; None if no server is listening."""
+    path = socket_path(content_path)
+    if _UnixServer is None or not path.exists():
+        return None
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        try:
+            sock.connect(str(path))
+        except OSError:
+            return None
+        # A server is listening, so failures from here on are its errors;
+        # falling back would start a second indexer on the same vault.
+        try:
+            sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as f:
+                line = f.readline()
+        except OSError as e:
+            return {"error": f"No response from server: {e}"}
+    if not line:
+        return {"error": "Server closed the connection without a response"}
+    return json.loads(line)
+
+
+class IndexerSocket:
+    """Answers search/duplicates requests over a Unix domain socket."""
+
+    def __init__(self, content_path: str, get_indexer):
+        self.content_path = content_path
+        self.path = socket_path(content_path)
+        # Returns the indexer, waiting for it to finish loading if needed
+        self.get_indexer = get_indexer
+        self._server = None
+
+    def start(self) -> bool:
+        """Start listening in a background thread. Returns False if unavailable."""
+        if _UnixServer is None:
+            return False
+        if self.path.exists():
+            if request(self.content_path, {"cmd": "ping"}, timeout=1.0) is not None:
+                print(f"[WARN] Another server is already listening on {self.path}")
+                return False
+            self.path.unlink()  # Left behind by a server that did not shut down
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Bind inside a private (0700) directory and move the socket into
+        # place only once it is 0600, so other users can never connect to it
+        tmp_dir = Path(tempfile.mkdtemp(dir=self.path.parent))
+        tmp_path = tmp_dir / self.path.name
+        try:
+            self._server = _UnixServer(str(tmp_path), self._handler())
+            os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            if self._server:
+                self._server.server_close()
+                self._server = None
+            print(f"[WARN] Could not listen on {self.path}: {e}")
+            return False
+        finally:
+            tmp_path.unlink(missing_ok=True)
+            tmp_dir.rmdir()
+        self._server.daemon_threads = True
+        Thread(target=self._server.serve_forever, daemon=True).start()
+        print(f"[INFO] Listening for CLI requests on {self.path}")
+        return True
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self.path.unlink(missing_ok=True)
+            self._server = None
+
+    def _handler(self):
+        get_indexer = self.get_indexer
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                line = self.rfile.readline()
+                if not line:
+                    return
+                try:
+                    response = _dispatch(get_indexer, json.loads(line))
+                except Exception as e:
+                    response = {"error": str(e)}
+                self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+        return Handler
+
+
+def _dispatch(get_indexer, req: dict):
+    cmd = req.get("cmd")
+    if cmd == "ping":
+        return "pong"
+    if cmd not in ("search", "duplicates"):
+        return {"error": f"Unknown command: {cmd}"}
+    # Each connection has its own thread, so waiting here for a first build
+    # only holds up this request
+    indexer = get_indexer()
+    if cmd == "search":
+        return indexer.search(req["query"], req.get("top_k", 5))
+    return indexer.find_duplicates(req["file"], req.get("threshold"))
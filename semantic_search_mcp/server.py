@@ -1,10 +1,13 @@
 """MCP server for semantic search."""
 
+import asyncio
 import os
+from threading import Lock, Thread
 
 from fastmcp import FastMCP
 
 from .indexer import VaultIndexer, VaultWatcher
+from .ipc import IndexerSocket
 
 # Configuration from environment
 CONTENT_PATH = os.environ.get("CONTENT_PATH", "./content")
@@ -15,20 +18,65 @@ mcp = FastMCP("semantic-search-mcp")
 # Lazy initialization
 _indexer = None
 _watcher = None
+_init_lock = Lock()
 
 
 def get_indexer() -> VaultIndexer:
     """Get or create the indexer instance."""
     global _indexer, _watcher
-    if _indexer is None:
-        _indexer = VaultIndexer(CONTENT_PATH)
-        _watcher = VaultWatcher(_indexer)
-        _watcher.start(background=True)
+    # Called from worker threads and the CLI socket, not just the event loop
+    with _init_lock:
+        if _indexer is None:
+            _indexer = VaultIndexer(CONTENT_PATH)
+            _watcher = VaultWatcher(_indexer)
+            _watcher.start(background=True)
     return _indexer
 
 
+class _QueryBatcher:
+    """Coalesces concurrent search requests into one encode and one FAISS search."""
+
+    def __init__(self, max_batch: int = 16):
+        self.max_batch = max_batch
+        self._queue = None
+        self._worker = None
+
+    async def search(self, query: str, top_k: int) -> list[dict]:
+        if self._queue is None:
+            # Created lazily so both belong to the loop fastmcp runs on
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((query, top_k, future))
+        return await future
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            queries = [query for query, _, _ in batch]
+            # Results are sorted by score, so each request takes a prefix
+            max_k = max(top_k for _, top_k, _ in batch)
+            try:
+                results = await asyncio.to_thread(
+                    lambda: get_indexer().search_many(queries, max_k))
+            except Exception as e:
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, top_k, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result[:top_k])
+
+
+_batcher = _QueryBatcher()
+
+
 @mcp.tool
-def search_related(query: str, top_k: int = 5) -> list[dict]:
+async def search_related(query: str, top_k: int = 5) -> list[dict]:
     """Search for notes semantically related to the query text.
 
     Args:
@@ -38,8 +86,7 @@ def search_related(query: str, top_k: int = 5) -> list[dict]:
     Returns:
         List of matching notes with path and similarity score
     """
-    indexer = get_indexer()
-    return indexer.search(query, top_k)
+    return await _batcher.search(query, top_k)
 
 
 @mcp.tool
@@ -56,7 +103,28 @@ def check_duplicates(file_path: str) -> list[dict]:
     return indexer.find_duplicates(file_path)
 
 
+def _use_uvloop():
+    """Run the server's event loop on uvloop if it is installed."""
+    try:
+        import uvloop
+    except ImportError:
+        return
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    print("[INFO] Using uvloop event loop")
+
+
 def run():
     """Run the MCP server."""
     print("[INFO] Starting MCP server (fastmcp)")
-    mcp.run()
+    _use_uvloop()
+    # Load the index in the background so it is warm for the first request
+    Thread(target=get_indexer, daemon=True).start()
+    # Lets CLI commands reuse this process's indexer instead of loading their own
+    cli_socket = IndexerSocket(CONTENT_PATH, get_indexer)
+    cli_socket.start()
+    try:
+        mcp.run()
+    finally:
+        cli_socket.stop()
+        if _watcher is not None:
+            _watcher.stop()